@@ -3,22 +3,23 @@
 from __future__ import annotations
 
 import argparse
-import json
+import multiprocessing
+import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from core import AnalysisStore, parse_nmon, run_all_rules
 from core.model import FileAnalysis
+from core.utils import json_loads
 
 
 def load_thresholds(config_path: Path) -> dict:
-    with open(config_path, "r", encoding="utf-8") as handle:
-        return json.load(handle)
+    return json_loads(config_path.read_bytes())
 
 
 def analyze_file(path: Path, thresholds: dict) -> FileAnalysis:
     nmon = parse_nmon(path)
-    checks, overall = run_all_rules(nmon, thresholds)
+    checks, overall, _ = run_all_rules(nmon, thresholds)
     file_id = path.stem
     return FileAnalysis(
         file_id=file_id,
@@ -30,23 +31,61 @@ def analyze_file(path: Path, thresholds: dict) -> FileAnalysis:
     )
 
 
-def analyze_directory(input_dir: Path, output_dir: Path, thresholds_path: Path) -> None:
+SAVE_BATCH_SIZE = 64
+
+
+def _analyze_worker(args: Tuple[Path, dict]) -> Tuple[FileAnalysis, Path]:
+    path, thresholds = args
+    return analyze_file(path, thresholds), path
+
+
+def analyze_directory(
+    input_dir: Path,
+    output_dir: Path,
+    thresholds_path: Path,
+    jobs: Optional[int] = None,
+) -> None:
     thresholds = load_thresholds(thresholds_path)
     store = AnalysisStore(output_dir)
     files = sorted(path for path in input_dir.glob("*.nmon"))
     total = len(files)
     ok_files = warn_files = crit_files = warn_checks = crit_checks = 0
-    for path in files:
-        analysis = analyze_file(path, thresholds)
-        warn_checks += sum(1 for check in analysis.checks if check.level == "WARN")
-        crit_checks += sum(1 for check in analysis.checks if check.level == "CRIT")
-        if analysis.overall == "CRIT":
-            crit_files += 1
-        elif analysis.overall == "WARN":
-            warn_files += 1
-        else:
-            ok_files += 1
-        store.save_analysis(analysis, path)
+    pending: List[Tuple[FileAnalysis, Path]] = []
+    processes = max(1, min(jobs or os.cpu_count() or 1, total or 1))
+    tasks = [(path, thresholds) for path in files]
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap_unordered(_analyze_worker, tasks)
+    else:
+        pool = None
+        results = map(_analyze_worker, tasks)
+    completed = False
+    try:
+        for analysis, path in results:
+            warn_checks += analysis.warn_count
+            crit_checks += analysis.crit_count
+            if analysis.overall == "CRIT":
+                crit_files += 1
+            elif analysis.overall == "WARN":
+                warn_files += 1
+            else:
+                ok_files += 1
+            pending.append((analysis, path))
+            if len(pending) >= SAVE_BATCH_SIZE:
+                store.save_analysis_batch(pending)
+                pending = []
+        completed = True
+    finally:
+        if pool is not None:
+            # On error, don't wait for the remaining files before raising.
+            if completed:
+                pool.close()
+            else:
+                pool.terminate()
+            pool.join()
+        # Persist whatever finished, even if a later file failed.
+        if pending:
+            store.save_analysis_batch(pending)
     summary = (
         f"TOTAL: files={total} | OK={ok_files} | CRIT(files)={crit_files} | "
         f"WARN(files)={warn_files} | WARN(checks)={warn_checks} | CRIT(checks)={crit_checks}"
@@ -64,6 +103,13 @@ def build_parser() -> argparse.ArgumentParser:
         default="config/thresholds.json",
         help="Path to thresholds JSON configuration",
     )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes (defaults to the CPU count)",
+    )
     return parser
 
 
@@ -75,8 +121,9 @@ def main(argv: List[str] | None = None) -> None:
     thresholds_path = Path(args.thresholds)
     if not input_dir.exists():
         raise SystemExit(f"Input directory {input_dir} does not exist")
-    analyze_directory(input_dir, output_dir, thresholds_path)
+    analyze_directory(input_dir, output_dir, thresholds_path, jobs=args.jobs)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
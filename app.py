@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
-import os
-import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from io import StringIO
+from io import BytesIO, StringIO
 from pathlib import Path
-from typing import List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from flask import (
     Flask,
@@ -23,8 +24,8 @@ from flask import (
 from werkzeug.utils import secure_filename
 
 from core import AnalysisStore, parse_nmon, run_all_rules
-from core.model import FileAnalysis
-from core.utils import downsample_series
+from core.model import CheckResult, FileAnalysis, NmonFile
+from core.utils import downsample_series, json_dumps, json_loads
 
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
@@ -34,35 +35,104 @@ app = Flask(__name__)
 store = AnalysisStore(DATA_DIR)
 
 
+_thresholds_cache: Dict[str, object] = {"mtime_ns": None, "data": None}
+_thresholds_lock = threading.Lock()
+
+
 def load_thresholds() -> dict:
-    with open(CONFIG_PATH, "r", encoding="utf-8") as handle:
-        return json.load(handle)
+    mtime_ns = CONFIG_PATH.stat().st_mtime_ns
+    with _thresholds_lock:
+        if _thresholds_cache["mtime_ns"] != mtime_ns:
+            _thresholds_cache["data"] = json_loads(CONFIG_PATH.read_bytes())
+            _thresholds_cache["mtime_ns"] = mtime_ns
+        return _thresholds_cache["data"]
 
 
 def save_thresholds(data: dict) -> None:
-    with open(CONFIG_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
+    CONFIG_PATH.write_bytes(json_dumps(data, indent=True))
+    with _thresholds_lock:
+        # Refresh directly: a quick rewrite may not change a coarse mtime.
+        _thresholds_cache["data"] = data
+        _thresholds_cache["mtime_ns"] = CONFIG_PATH.stat().st_mtime_ns
+
+
+class _UploadResult(NamedTuple):
+    hostname: Optional[str]
+    start_time: Optional[datetime]
+    checks: List[CheckResult]
+    overall: str
+    series: bytes
+
+
+# Re-uploading the same bytes under unchanged thresholds skips parsing and
+# rules. Entries hold serialized chart series, so keep the cache small.
+_UPLOAD_CACHE_SIZE = 32
+_upload_cache: OrderedDict[Tuple[str, str], _UploadResult] = OrderedDict()
+_upload_cache_lock = threading.Lock()
+
+
+def _upload_cache_key(content: bytes, thresholds: dict) -> Tuple[str, str]:
+    thresholds_json = json.dumps(thresholds, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(content).hexdigest(), hashlib.sha256(thresholds_json).hexdigest()
+
+
+def _analyze_content(content: bytes, thresholds: dict) -> _UploadResult:
+    key = _upload_cache_key(content, thresholds)
+    with _upload_cache_lock:
+        result = _upload_cache.get(key)
+        if result is not None:
+            _upload_cache.move_to_end(key)
+            return result
+    nmon = parse_nmon(BytesIO(content))
+    checks, overall, _ = run_all_rules(nmon, thresholds)
+    result = _UploadResult(
+        hostname=nmon.hostname,
+        start_time=nmon.start_time,
+        checks=checks,
+        overall=overall,
+        series=json_dumps(_series_payload(nmon)),
+    )
+    with _upload_cache_lock:
+        _upload_cache[key] = result
+        while len(_upload_cache) > _UPLOAD_CACHE_SIZE:
+            _upload_cache.popitem(last=False)
+    return result
+
+
+def json_response(obj) -> Response:
+    return Response(json_dumps(obj), mimetype="application/json")
 
 
 def allowed_file(filename: str) -> bool:
     return filename.lower().endswith(".nmon")
 
 
-def _analysis_from_upload(temp_path: Path, filename: str, thresholds: dict) -> FileAnalysis:
-    nmon = parse_nmon(temp_path)
-    checks, overall = run_all_rules(nmon, thresholds)
+def _series_payload(nmon: NmonFile) -> dict:
+    return {
+        name: downsample_series(series.timestamps, series.values)
+        for name, series in nmon.series.items()
+    }
+
+
+def _analysis_from_upload(
+    content: bytes, filename: str, thresholds: dict
+) -> Tuple[FileAnalysis, dict]:
     stem = Path(secure_filename(filename)).stem or "nmon"
     file_id = store.generate_file_id(stem)
+    result = _analyze_content(content, thresholds)
+    # Only keep the upload once parsing and rules have succeeded.
+    store.save_upload(file_id, content)
     analysis = FileAnalysis(
         file_id=file_id,
         source_path=filename,
-        hostname=nmon.hostname,
-        start_time=nmon.start_time,
-        checks=checks,
-        overall=overall,
+        hostname=result.hostname,
+        start_time=result.start_time,
+        checks=list(result.checks),
+        overall=result.overall,
     )
-    store.save_analysis(analysis, temp_path)
-    return analysis
+    data = store.save_analysis(analysis)
+    store.save_series_bytes(file_id, result.series)
+    return analysis, data
 
 
 @app.route("/")
@@ -95,12 +165,16 @@ def api_files():
             summary["warn_files"] += 1
         else:
             summary["ok_files"] += 1
-        for check in data.get("checks", []):
-            if check.get("level") == "WARN":
-                summary["warn_checks"] += 1
-            elif check.get("level") == "CRIT":
-                summary["crit_checks"] += 1
-    return jsonify({"files": files, "summary": summary})
+        if "warn_count" in data:
+            summary["warn_checks"] += data["warn_count"]
+            summary["crit_checks"] += data.get("crit_count", 0)
+        else:
+            for check in data.get("checks", []):
+                if check.get("level") == "WARN":
+                    summary["warn_checks"] += 1
+                elif check.get("level") == "CRIT":
+                    summary["crit_checks"] += 1
+    return json_response({"files": files, "summary": summary})
 
 
 @app.post("/upload")
@@ -121,29 +195,18 @@ def upload():
     for file in uploaded_files:
         if not file.filename or not allowed_file(file.filename):
             continue
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".nmon") as temp:
-            file.save(temp.name)
-            temp_path = Path(temp.name)
-        try:
-            analysis = _analysis_from_upload(temp_path, file.filename, thresholds)
-            data = analysis.as_dict()
-            stored.append(data)
-            summary["total_files"] += 1
-            if analysis.overall == "CRIT":
-                summary["crit_files"] += 1
-            elif analysis.overall == "WARN":
-                summary["warn_files"] += 1
-            else:
-                summary["ok_files"] += 1
-            for check in analysis.checks:
-                if check.level == "WARN":
-                    summary["warn_checks"] += 1
-                elif check.level == "CRIT":
-                    summary["crit_checks"] += 1
-        finally:
-            if temp_path.exists():
-                os.unlink(temp_path)
-    return jsonify({"summary": summary, "files": stored})
+        analysis, data = _analysis_from_upload(file.stream.read(), file.filename, thresholds)
+        stored.append(data)
+        summary["total_files"] += 1
+        if analysis.overall == "CRIT":
+            summary["crit_files"] += 1
+        elif analysis.overall == "WARN":
+            summary["warn_files"] += 1
+        else:
+            summary["ok_files"] += 1
+        summary["warn_checks"] += analysis.warn_count
+        summary["crit_checks"] += analysis.crit_count
+    return json_response({"summary": summary, "files": stored})
 
 
 @app.get("/file/<file_id>")
@@ -159,15 +222,17 @@ def api_file(file_id: str):
     data = store.load_analysis(file_id)
     if not data:
         return jsonify({"error": "Not found"}), 404
-    upload_path = store.upload_dir / f"{file_id}.nmon"
-    if not upload_path.exists():
-        return jsonify({"error": "Upload not available"}), 404
-    nmon = parse_nmon(upload_path)
-    series_payload = {
-        name: downsample_series(series.timestamps, series.values)
-        for name, series in nmon.series.items()
-    }
-    return jsonify({"analysis": data, "series": series_payload})
+    series_bytes = store.load_series_bytes(file_id)
+    if series_bytes is None:
+        upload_path = store.upload_path(file_id)
+        if not upload_path.exists():
+            return jsonify({"error": "Upload not available"}), 404
+        store.save_series(file_id, _series_payload(parse_nmon(upload_path)))
+        series_bytes = store.load_series_bytes(file_id)
+    body = b'{"analysis":' + json_dumps(data) + b',"series":' + series_bytes + b"}"
+    response = Response(body, mimetype="application/json")
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @app.get("/report")
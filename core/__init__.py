@@ -1,7 +1,7 @@
 """Core package for the NMON analyzer."""
 
 from .parser import parse_nmon
-from .rules import ALL_RULES, run_all_rules
+from .rules import ALL_RULES, RuleContext, run_all_rules
 from .store import AnalysisStore
 from .model import (
     NmonFile,
@@ -14,6 +14,7 @@ from .model import (
 __all__ = [
     "parse_nmon",
     "ALL_RULES",
+    "RuleContext",
     "run_all_rules",
     "AnalysisStore",
     "NmonFile",
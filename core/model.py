@@ -6,27 +6,35 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
 
-@dataclass
+from .utils import infer_sampling_minutes
+
+
+@dataclass(slots=True)
 class NmonSeries:
     """Represents a single numerical time series extracted from an NMON file."""
 
     name: str
-    timestamps: List[datetime]
-    values: List[float]
+    timestamps: np.ndarray
+    values: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.timestamps = np.asarray(self.timestamps, dtype="datetime64[s]")
+        self.values = np.asarray(self.values, dtype=np.float64)
 
     def as_dict(self) -> Dict[str, List]:
         return {
             "name": self.name,
-            "timestamps": [ts.isoformat() for ts in self.timestamps],
-            "values": self.values,
+            "timestamps": np.datetime_as_string(self.timestamps, unit="s").tolist(),
+            "values": self.values.tolist(),
         }
 
     def is_empty(self) -> bool:
-        return not self.timestamps or not self.values
+        return len(self.timestamps) == 0 or len(self.values) == 0
 
 
-@dataclass
+@dataclass(slots=True)
 class NmonFile:
     """Represents the structured contents of an NMON file."""
 
@@ -34,12 +42,38 @@ class NmonFile:
     hostname: Optional[str]
     start_time: Optional[datetime]
     series: Dict[str, NmonSeries] = field(default_factory=dict)
+    series_by_kind: Dict[str, Dict[str, NmonSeries]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _sampling_minutes: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Per-device series are named "<kind>::<device>"; bucket them by kind.
+        for name, series in self.series.items():
+            kind, sep, device = name.partition("::")
+            if sep:
+                self.series_by_kind.setdefault(kind, {})[device] = series
 
     def get_series(self, key: str) -> Optional[NmonSeries]:
         return self.series.get(key)
 
+    @property
+    def sampling_minutes(self) -> float:
+        """Median sampling interval in minutes, computed once per file.
 
-@dataclass
+        All NMON sections share the ZZZZ snapshots, so the CPU series (or the
+        first non-empty one) stands in for the whole file.
+        """
+        if self._sampling_minutes is None:
+            candidates = [self.series.get("cpu_busy_pct"), *self.series.values()]
+            reference = next((s for s in candidates if s is not None and not s.is_empty()), None)
+            self._sampling_minutes = (
+                infer_sampling_minutes(reference.timestamps) if reference is not None else 0.0
+            )
+        return self._sampling_minutes
+
+
+@dataclass(slots=True)
 class CheckResult:
     """Result from executing a single diagnostic rule."""
 
@@ -50,8 +84,18 @@ class CheckResult:
     evidence: Dict[str, object] = field(default_factory=dict)
     metrics: Dict[str, float] = field(default_factory=dict)
 
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "rule": self.rule_name,
+            "level": self.level,
+            "summary": self.summary,
+            "details": self.details,
+            "evidence": self.evidence,
+            "metrics": self.metrics,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class FileAnalysis:
     """Full analysis output for a single NMON file."""
 
@@ -62,6 +106,14 @@ class FileAnalysis:
     checks: List[CheckResult]
     overall: str
 
+    @property
+    def warn_count(self) -> int:
+        return sum(1 for check in self.checks if check.level == "WARN")
+
+    @property
+    def crit_count(self) -> int:
+        return sum(1 for check in self.checks if check.level == "CRIT")
+
     def as_dict(self) -> Dict[str, object]:
         return {
             "file_id": self.file_id,
@@ -69,21 +121,13 @@ class FileAnalysis:
             "hostname": self.hostname,
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "overall": self.overall,
-            "checks": [
-                {
-                    "rule": check.rule_name,
-                    "level": check.level,
-                    "summary": check.summary,
-                    "details": check.details,
-                    "evidence": check.evidence,
-                    "metrics": check.metrics,
-                }
-                for check in self.checks
-            ],
+            "warn_count": self.warn_count,
+            "crit_count": self.crit_count,
+            "checks": [check.as_dict() for check in self.checks],
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchSummary:
     """Aggregated summary for a batch upload."""
 
@@ -2,31 +2,85 @@
 
 from __future__ import annotations
 
+import csv
+import mmap
+import os
+from array import array
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from .model import NmonFile, NmonSeries
 
 
-_TIME_FORMATS = [
-    ("%H:%M:%S", "%d-%b-%Y"),
-    ("%H:%M:%S", "%Y-%m-%d"),
-    ("%H:%M:%S", "%m/%d/%Y"),
-]
+# Sections the parser consumes; lines for any other section (TOP, JFSFILE,
+# DISKBUSY, BBBP, ...) are rejected on the raw bytes before decoding.
+_WANTED_SECTIONS = (
+    "AAA",
+    "BBB",
+    "ZZZZ",
+    "CPU_ALL",
+    "CPU_TOT",
+    "MEM",
+    "DISKWRITE",
+    "DISKXFER",
+    "NET",
+    "NETPACK",
+)
+_RELEVANT_PREFIXES = tuple(f"{section},".encode("ascii") for section in _WANTED_SECTIONS)
 
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
 
-def _parse_timestamp(label: str, time_str: str, date_str: str) -> Optional[datetime]:
-    for time_fmt, date_fmt in _TIME_FORMATS:
-        try:
-            dt = datetime.strptime(f"{date_str} {time_str}", f"{date_fmt} {time_fmt}")
-            return dt
-        except ValueError:
-            continue
-    return None
+_MONTHS = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12,
+}
 
+_TIME_FORMATS = (
+    "%d-%b-%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+)
 
+
+def _fast_date(date_str: str) -> Optional[datetime]:
+    """Parse the NMON ``DD-Mon-YYYY`` form without going through strptime."""
+    if len(date_str) != 11 or date_str[2] != "-" or date_str[6] != "-":
+        return None
+    month = _MONTHS.get(date_str[3:6].upper())
+    day = date_str[0:2]
+    year = date_str[7:11]
+    if month is None or not day.isdigit() or not year.isdigit():
+        return None
+    try:
+        return datetime(int(year), month, int(day))
+    except ValueError:
+        return None
+
+
+def _fast_timestamp(time_str: str, date_str: str) -> Optional[datetime]:
+    if len(time_str) != 8 or time_str[2] != ":" or time_str[5] != ":":
+        return None
+    hours = time_str[0:2]
+    minutes = time_str[3:5]
+    seconds = time_str[6:8]
+    if not (hours.isdigit() and minutes.isdigit() and seconds.isdigit()):
+        return None
+    date = _fast_date(date_str)
+    if date is None:
+        return None
+    try:
+        return date.replace(hour=int(hours), minute=int(minutes), second=int(seconds))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
 def _as_float(value: str) -> Optional[float]:
     if value is None:
         return None
@@ -40,68 +94,152 @@ def _as_float(value: str) -> Optional[float]:
         return None
 
 
+def _cell_float(payload: List[str], idx: Optional[int]) -> float:
+    if idx is None or idx >= len(payload):
+        return float("nan")
+    val = _as_float(payload[idx])
+    return val if val is not None else float("nan")
+
+
+def _datetime64(seconds: array) -> np.ndarray:
+    return np.frombuffer(seconds, dtype="datetime64[s]")
+
+
+def _float64(values: array) -> np.ndarray:
+    return np.frombuffer(values, dtype=np.float64)
+
+
+def _time_ordered(seconds: array, values: array) -> Tuple[np.ndarray, np.ndarray]:
+    """View buffered samples as arrays, sorting by time only if they are not already."""
+    timestamps = _datetime64(seconds)
+    vals = _float64(values)
+    if not np.all(timestamps[1:] >= timestamps[:-1]):
+        # e.g. a `sort`ed file with more than 9999 snapshots: T10000 < T1001.
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        vals = vals[order]
+    return timestamps, vals
+
+
 class NmonParser:
     """Parses NMON formatted files into structured series."""
 
     def __init__(self) -> None:
+        self._last_fmt_idx = 0
         self.headers: Dict[str, List[str]] = {}
         self.timestamp_labels: Dict[str, datetime] = {}
         self.hostname: Optional[str] = None
         self.start_time: Optional[datetime] = None
-        self.cpu_rows: List[Tuple[datetime, List[str]]] = []
-        self.mem_rows: List[Tuple[datetime, List[str]]] = []
-        self.disk_rows: List[Tuple[datetime, List[str]]] = []
-        self.net_rows: List[Tuple[datetime, List[str]]] = []
+        self._label_seconds: Dict[str, int] = {}
+        # Row timestamps are buffered as epoch seconds so they can be viewed
+        # as datetime64[s] without converting datetime objects one by one.
+        self.cpu_ts = array("q")
+        self.cpu_payloads: List[List[str]] = []
+        self.mem_ts = array("q")
+        self.mem_payloads: List[List[str]] = []
+        self.disk_ts = array("q")
+        self.disk_payloads: List[List[str]] = []
+        self.net_ts = array("q")
+        self.net_payloads: List[List[str]] = []
+        self._row_buffers: Dict[str, Tuple[array, List[List[str]]]] = {
+            "CPU_ALL": (self.cpu_ts, self.cpu_payloads),
+            "CPU_TOT": (self.cpu_ts, self.cpu_payloads),
+            "MEM": (self.mem_ts, self.mem_payloads),
+            "DISKWRITE": (self.disk_ts, self.disk_payloads),
+            "DISKXFER": (self.disk_ts, self.disk_payloads),
+            "NET": (self.net_ts, self.net_payloads),
+            "NETPACK": (self.net_ts, self.net_payloads),
+        }
+
+    def _parse_timestamp(self, time_str: str, date_str: str) -> Optional[datetime]:
+        dt = _fast_timestamp(time_str, date_str)
+        if dt is not None:
+            return dt
+        text = f"{date_str} {time_str}"
+        try:
+            return datetime.strptime(text, _TIME_FORMATS[self._last_fmt_idx])
+        except ValueError:
+            pass
+        for idx, fmt in enumerate(_TIME_FORMATS):
+            if idx == self._last_fmt_idx:
+                continue
+            try:
+                dt = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            self._last_fmt_idx = idx
+            return dt
+        return None
 
     def feed_line(self, line: str) -> None:
         line = line.strip()
         if not line:
             return
-        parts = [part.strip() for part in line.split(",")]
-        key = parts[0]
-        if key == "AAA" and len(parts) >= 3:
-            label = parts[1].lower()
-            if label in {"hostname", "host"}:
-                self.hostname = parts[2]
-        elif key == "BBB" and len(parts) >= 3:
-            label = parts[1].lower()
-            if label == "date" and not self.start_time:
+        self.feed_parts(line.split(","))
+
+    def feed_parts(self, parts: List[str]) -> None:
+        if not parts:
+            return
+        key = parts[0].strip()
+        handler = _HANDLERS.get(key)
+        if handler is not None:
+            handler(self, parts)
+        else:
+            self._handle_section(key, parts)
+
+    def _handle_aaa(self, parts: List[str]) -> None:
+        if len(parts) < 3:
+            return
+        label = parts[1].strip().lower()
+        if label in {"hostname", "host"}:
+            self.hostname = parts[2].strip()
+
+    def _handle_bbb(self, parts: List[str]) -> None:
+        if len(parts) < 3:
+            return
+        label = parts[1].strip().lower()
+        if label == "date" and not self.start_time:
+            date_str = parts[2].strip()
+            self.start_time = _fast_date(date_str)
+            if self.start_time is None:
                 try:
-                    self.start_time = datetime.strptime(parts[2], "%d-%b-%Y")
+                    self.start_time = datetime.strptime(date_str, "%d-%b-%Y")
                 except ValueError:
                     self.start_time = None
-        elif key == "ZZZZ" and len(parts) >= 4:
-            label = parts[1]
-            time_str = parts[2]
-            date_str = parts[3]
-            dt = _parse_timestamp(label, time_str, date_str)
-            if dt is not None:
-                if self.start_time is None:
-                    self.start_time = dt
-                self.timestamp_labels[label] = dt
-        else:
-            if len(parts) > 1 and not parts[1].startswith("T"):
-                self.headers[key] = parts[1:]
-                return
-            if len(parts) > 1 and parts[1].startswith("T"):
-                label = parts[1]
-                dt = self.timestamp_labels.get(label)
-                if not dt:
-                    return
-                payload = parts[2:]
-                if key.startswith("CPU_ALL") or key.startswith("CPU_TOT"):
-                    self.cpu_rows.append((dt, payload))
-                elif key == "MEM":
-                    self.mem_rows.append((dt, payload))
-                elif key in {"DISKWRITE", "DISKXFER"}:
-                    self.disk_rows.append((dt, payload))
-                elif key in {"NET", "NETPACK"}:
-                    self.net_rows.append((dt, payload))
+
+    def _handle_zzzz(self, parts: List[str]) -> None:
+        if len(parts) < 4:
+            return
+        label = parts[1].strip()
+        time_str = parts[2].strip()
+        date_str = parts[3].strip()
+        dt = self._parse_timestamp(time_str, date_str)
+        if dt is not None:
+            if self.start_time is None:
+                self.start_time = dt
+            self.timestamp_labels[label] = dt
+            self._label_seconds[label] = (dt - _EPOCH) // _ONE_SECOND
+
+    def _handle_section(self, key: str, parts: List[str]) -> None:
+        if len(parts) < 2:
+            return
+        if not parts[1].lstrip().startswith("T"):
+            self.headers[key] = [name.strip() for name in parts[1:]]
+            return
+        buffers = self._row_buffers.get(key)
+        if buffers is None:
+            return
+        seconds = self._label_seconds.get(parts[1].strip())
+        if seconds is None:
+            return
+        timestamps, payloads = buffers
+        timestamps.append(seconds)
+        payloads.append(parts[2:])
 
     def to_nmon_file(self, source_path: str) -> NmonFile:
         series: Dict[str, NmonSeries] = {}
-        if self.cpu_rows:
-            timestamps = [row[0] for row in self.cpu_rows]
+        if self.cpu_payloads:
+            timestamps = _datetime64(self.cpu_ts).copy()
             idle_idx = None
             header = self.headers.get("CPU_ALL", self.headers.get("CPU_TOT", []))
             if header:
@@ -109,19 +247,20 @@ class NmonParser:
                     if "idle" in name.lower():
                         idle_idx = idx
                         break
-            values = []
-            for _, payload in self.cpu_rows:
-                idle_val = None
+
+            def idle_cell(payload: List[str]) -> float:
                 if idle_idx is not None and idle_idx < len(payload):
-                    idle_val = _as_float(payload[idle_idx])
-                elif payload:
-                    idle_val = _as_float(payload[-1])
-                values.append(100.0 - idle_val if idle_val is not None else float("nan"))
+                    return _cell_float(payload, idle_idx)
+                if payload:
+                    return _cell_float(payload, len(payload) - 1)
+                return float("nan")
+
+            idle = array("d", [idle_cell(payload) for payload in self.cpu_payloads])
             series["cpu_busy_pct"] = NmonSeries(
-                name="cpu_busy_pct", timestamps=timestamps, values=values
+                name="cpu_busy_pct", timestamps=timestamps, values=100.0 - _float64(idle)
             )
-        if self.mem_rows:
-            timestamps = [row[0] for row in self.mem_rows]
+        if self.mem_payloads:
+            timestamps = _datetime64(self.mem_ts).copy()
             header = [h.lower() for h in self.headers.get("MEM", [])]
             active_idx = None
             used_idx = None
@@ -133,78 +272,73 @@ class NmonParser:
                     used_idx = idx
                 if free_idx is None and "free" in name and "swap" not in name:
                     free_idx = idx
-            active_vals = []
-            used_vals = []
-            free_vals = []
-            for _, payload in self.mem_rows:
-                def get(idx):
-                    if idx is None or idx >= len(payload):
-                        return float("nan")
-                    val = _as_float(payload[idx])
-                    return val if val is not None else float("nan")
-
-                active_vals.append(get(active_idx))
-                used_vals.append(get(used_idx))
-                free_vals.append(get(free_idx))
+            active_vals = array("d")
+            used_vals = array("d")
+            free_vals = array("d")
+            for payload in self.mem_payloads:
+                active_vals.append(_cell_float(payload, active_idx))
+                used_vals.append(_cell_float(payload, used_idx))
+                free_vals.append(_cell_float(payload, free_idx))
             series["mem_active_kb"] = NmonSeries(
-                name="mem_active_kb", timestamps=timestamps, values=active_vals
+                name="mem_active_kb", timestamps=timestamps, values=_float64(active_vals)
             )
             series["mem_used_kb"] = NmonSeries(
-                name="mem_used_kb", timestamps=timestamps, values=used_vals
+                name="mem_used_kb", timestamps=timestamps, values=_float64(used_vals)
             )
             series["mem_free_kb"] = NmonSeries(
-                name="mem_free_kb", timestamps=timestamps, values=free_vals
+                name="mem_free_kb", timestamps=timestamps, values=_float64(free_vals)
             )
-        if self.disk_rows:
-            device_points: Dict[str, List[Tuple[datetime, float]]] = defaultdict(list)
-            for dt, payload in self.disk_rows:
+        if self.disk_payloads:
+            device_ts: Dict[str, array] = defaultdict(lambda: array("q"))
+            device_vals: Dict[str, array] = defaultdict(lambda: array("d"))
+            for dt, payload in zip(self.disk_ts, self.disk_payloads):
                 for idx in range(0, len(payload), 2):
-                    device = payload[idx]
+                    device = payload[idx].strip()
                     value = _as_float(payload[idx + 1]) if idx + 1 < len(payload) else None
                     if device and value is not None:
-                        device_points[device].append((dt, value))
-            for device, points in device_points.items():
-                points.sort(key=lambda item: item[0])
-                timestamps = [ts for ts, _ in points]
-                values = [val for _, val in points]
+                        device_ts[device].append(dt)
+                        device_vals[device].append(value)
+            for device, timestamps in device_ts.items():
                 series_name = f"disk_write_kbps::{device}"
+                ordered_ts, ordered_vals = _time_ordered(timestamps, device_vals[device])
                 series[series_name] = NmonSeries(
-                    name=series_name, timestamps=timestamps, values=values
+                    name=series_name, timestamps=ordered_ts, values=ordered_vals
                 )
-        if self.net_rows:
-            iface_rx: Dict[str, List[Tuple[datetime, float]]] = defaultdict(list)
-            iface_tx: Dict[str, List[Tuple[datetime, float]]] = defaultdict(list)
-            totals: Dict[datetime, float] = defaultdict(float)
-            for dt, payload in self.net_rows:
+        if self.net_payloads:
+            rx_ts: Dict[str, array] = defaultdict(lambda: array("q"))
+            rx_vals: Dict[str, array] = defaultdict(lambda: array("d"))
+            tx_ts: Dict[str, array] = defaultdict(lambda: array("q"))
+            tx_vals: Dict[str, array] = defaultdict(lambda: array("d"))
+            totals: Dict[int, float] = {}
+            for dt, payload in zip(self.net_ts, self.net_payloads):
                 step = 3 if len(payload) % 3 == 0 else 2
                 for idx in range(0, len(payload), step):
-                    iface = payload[idx]
+                    iface = payload[idx].strip()
                     rx = _as_float(payload[idx + 1]) if idx + 1 < len(payload) else None
                     tx = _as_float(payload[idx + 2]) if idx + 2 < len(payload) else None
                     if iface:
                         if rx is not None:
-                            iface_rx[iface].append((dt, rx))
-                            totals[dt] += rx
+                            rx_ts[iface].append(dt)
+                            rx_vals[iface].append(rx)
+                            totals[dt] = totals.get(dt, 0.0) + rx
                         if tx is not None:
-                            iface_tx[iface].append((dt, tx))
-                            totals[dt] += tx
-            for iface, points in iface_rx.items():
-                points.sort(key=lambda item: item[0])
-                timestamps = [ts for ts, _ in points]
-                values = [val for _, val in points]
+                            tx_ts[iface].append(dt)
+                            tx_vals[iface].append(tx)
+                            totals[dt] = totals.get(dt, 0.0) + tx
+            for iface, timestamps in rx_ts.items():
                 name = f"net_rx_kbps::{iface}"
-                series[name] = NmonSeries(name=name, timestamps=timestamps, values=values)
-            for iface, points in iface_tx.items():
-                points.sort(key=lambda item: item[0])
-                timestamps = [ts for ts, _ in points]
-                values = [val for _, val in points]
+                ordered_ts, ordered_vals = _time_ordered(timestamps, rx_vals[iface])
+                series[name] = NmonSeries(name=name, timestamps=ordered_ts, values=ordered_vals)
+            for iface, timestamps in tx_ts.items():
                 name = f"net_tx_kbps::{iface}"
-                series[name] = NmonSeries(name=name, timestamps=timestamps, values=values)
+                ordered_ts, ordered_vals = _time_ordered(timestamps, tx_vals[iface])
+                series[name] = NmonSeries(name=name, timestamps=ordered_ts, values=ordered_vals)
             if totals:
-                timestamps = sorted(totals)
-                values = [totals[ts] for ts in timestamps]
+                ordered_ts, ordered_vals = _time_ordered(
+                    array("q", totals.keys()), array("d", totals.values())
+                )
                 series["net_total_kbps"] = NmonSeries(
-                    name="net_total_kbps", timestamps=timestamps, values=values
+                    name="net_total_kbps", timestamps=ordered_ts, values=ordered_vals
                 )
         return NmonFile(
             source_path=source_path,
@@ -214,9 +348,34 @@ class NmonParser:
         )
 
 
-def parse_nmon(path: str | Path) -> NmonFile:
+_HANDLERS: Dict[str, Callable[[NmonParser, List[str]], None]] = {
+    "AAA": NmonParser._handle_aaa,
+    "BBB": NmonParser._handle_bbb,
+    "ZZZZ": NmonParser._handle_zzzz,
+}
+
+
+def _relevant_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    for line in lines:
+        line = line.lstrip()
+        if line.startswith(_RELEVANT_PREFIXES):
+            yield line.decode("utf-8", "ignore")
+
+
+def _feed_lines(parser: NmonParser, lines: Iterable[bytes]) -> None:
+    # QUOTE_NONE keeps plain comma-split semantics: NMON does not quote
+    # fields, and a stray '"' must not swallow the rest of the file.
+    for parts in csv.reader(_relevant_lines(lines), quoting=csv.QUOTE_NONE):
+        parser.feed_parts(parts)
+
+
+def parse_nmon(source: str | Path | IO[bytes]) -> NmonFile:
     parser = NmonParser()
-    with open(path, "r", encoding="utf-8", errors="ignore") as handle:
-        for line in handle:
-            parser.feed_line(line)
-    return parser.to_nmon_file(str(path))
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    _feed_lines(parser, iter(mapped.readline, b""))
+        return parser.to_nmon_file(str(source))
+    _feed_lines(parser, source)
+    return parser.to_nmon_file(getattr(source, "name", "<stream>"))
@@ -4,20 +4,31 @@ from __future__ import annotations
 
 import math
 import re
-from collections import defaultdict
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from .model import CheckResult, NmonFile, NmonSeries
 from .utils import (
-    infer_sampling_minutes,
+    isoformat_timestamp,
     linear_regression,
-    rolling_mean,
+    rolling_window_means,
     safe_percentile,
 )
 
 
 _LEVEL_ORDER = {"OK": 0, "WARN": 1, "CRIT": 2}
 
+_DEFAULT_EMMC_REGEX = "^(mmcblk\\d+|mmc\\d+)$"
+_DEFAULT_IFACE_REGEX = "^(eth\\d+|enp\\S+|wlan\\d+)$"
+
+
+@lru_cache(maxsize=16)
+def _compiled(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
 
 def _series_or_none(nmon_file: NmonFile, name: str) -> NmonSeries | None:
     series = nmon_file.get_series(name)
@@ -26,9 +37,49 @@ def _series_or_none(nmon_file: NmonFile, name: str) -> NmonSeries | None:
     return None
 
 
-def cpu_sustained_high(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
+@dataclass(slots=True)
+class RuleContext:
+    """Inputs shared by every rule, resolved once per file."""
+
+    sampling_minutes: float
+    cpu_busy: Optional[NmonSeries] = None
+    memory: Optional[NmonSeries] = None
+    emmc_devices: List[NmonSeries] = field(default_factory=list)
+    net_rx: List[NmonSeries] = field(default_factory=list)
+    net_tx: List[NmonSeries] = field(default_factory=list)
+    net_total: Optional[NmonSeries] = None
+
+    @classmethod
+    def build(cls, nmon_file: NmonFile, thresholds: Dict) -> "RuleContext":
+        mem_name = thresholds.get("memory_leak", {}).get("series", "mem_active_kb")
+        emmc_regex = _compiled(
+            thresholds.get("emmc_write", {}).get("device_regex", _DEFAULT_EMMC_REGEX)
+        )
+        iface_regex = _compiled(
+            thresholds.get("network", {}).get("iface_include_regex", _DEFAULT_IFACE_REGEX)
+        )
+        buckets = nmon_file.series_by_kind
+        return cls(
+            sampling_minutes=nmon_file.sampling_minutes or 1.0,
+            cpu_busy=_series_or_none(nmon_file, "cpu_busy_pct"),
+            memory=_series_or_none(nmon_file, mem_name),
+            emmc_devices=_matching(buckets.get("disk_write_kbps", {}), emmc_regex),
+            net_rx=_matching(buckets.get("net_rx_kbps", {}), iface_regex),
+            net_tx=_matching(buckets.get("net_tx_kbps", {}), iface_regex),
+            net_total=nmon_file.get_series("net_total_kbps"),
+        )
+
+
+def _matching(bucket: Dict[str, NmonSeries], regex: re.Pattern) -> List[NmonSeries]:
+    return [series for device, series in bucket.items() if regex.search(device)]
+
+
+def cpu_sustained_high(
+    nmon_file: NmonFile, thresholds: Dict, ctx: Optional[RuleContext] = None
+) -> CheckResult:
+    ctx = ctx or RuleContext.build(nmon_file, thresholds)
     config = thresholds.get("cpu", {})
-    series = _series_or_none(nmon_file, "cpu_busy_pct")
+    series = ctx.cpu_busy
     if not series:
         return CheckResult(
             rule_name="cpu_sustained_high",
@@ -36,13 +87,12 @@ def cpu_sustained_high(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
             summary="CPU busy series missing",
             details={"missing_series": True},
         )
-    sampling_minutes = infer_sampling_minutes(series.timestamps) or 1.0
-    window_points = max(1, int(round(config.get("sustained_minutes", 5) / sampling_minutes)))
-    averages = rolling_mean(series.values, window_points)
+    window_points = max(1, int(round(config.get("sustained_minutes", 5) / ctx.sampling_minutes)))
     warn_threshold = config.get("busy_pct_warn", 75.0)
     crit_threshold = config.get("busy_pct_crit", 90.0)
-    warn_window = _first_window_exceedance(averages, series.timestamps, warn_threshold, window_points)
-    crit_window = _first_window_exceedance(averages, series.timestamps, crit_threshold, window_points)
+    averages, warn_window, crit_window = _window_scan(
+        series.values, series.timestamps, window_points, warn_threshold, crit_threshold
+    )
     level = "OK"
     evidence = {}
     if crit_window:
@@ -51,10 +101,10 @@ def cpu_sustained_high(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
     elif warn_window:
         level = "WARN"
         evidence = _window_to_evidence(warn_window)
-    valid = [val for val in averages if not math.isnan(val)]
-    max_rolling = max(valid) if valid else float("nan")
+    valid = averages[~np.isnan(averages)]
+    max_rolling = float(valid.max()) if valid.size else float("nan")
     summary = (
-        f"Max rolling CPU busy {max_rolling:.1f}%" if valid else "No CPU data"
+        f"Max rolling CPU busy {max_rolling:.1f}%" if valid.size else "No CPU data"
     )
     return CheckResult(
         rule_name="cpu_sustained_high",
@@ -65,10 +115,12 @@ def cpu_sustained_high(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
     )
 
 
-def memory_leak(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
+def memory_leak(
+    nmon_file: NmonFile, thresholds: Dict, ctx: Optional[RuleContext] = None
+) -> CheckResult:
+    ctx = ctx or RuleContext.build(nmon_file, thresholds)
     config = thresholds.get("memory_leak", {})
-    series_name = config.get("series", "mem_active_kb")
-    series = _series_or_none(nmon_file, series_name)
+    series = ctx.memory
     if not series:
         return CheckResult(
             rule_name="memory_leak",
@@ -76,9 +128,8 @@ def memory_leak(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
             summary="Memory series missing",
             details={"missing_series": True},
         )
-    sampling_minutes = infer_sampling_minutes(series.timestamps) or 1.0
     window_minutes_min = config.get("window_minutes_min", 20)
-    if len(series.timestamps) * sampling_minutes < window_minutes_min:
+    if len(series.timestamps) * ctx.sampling_minutes < window_minutes_min:
         return CheckResult(
             rule_name="memory_leak",
             level="OK",
@@ -101,10 +152,16 @@ def memory_leak(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
     evidence = {}
     if slope >= crit_threshold and r2 >= r2_min:
         level = "CRIT"
-        evidence = {"window_start": series.timestamps[0].isoformat(), "window_end": series.timestamps[-1].isoformat()}
+        evidence = {
+            "window_start": isoformat_timestamp(series.timestamps[0]),
+            "window_end": isoformat_timestamp(series.timestamps[-1]),
+        }
     elif slope >= warn_threshold and r2 >= r2_min:
         level = "WARN"
-        evidence = {"window_start": series.timestamps[0].isoformat(), "window_end": series.timestamps[-1].isoformat()}
+        evidence = {
+            "window_start": isoformat_timestamp(series.timestamps[0]),
+            "window_end": isoformat_timestamp(series.timestamps[-1]),
+        }
     summary = f"Slope {slope:.1f} KB/min (R²={r2:.2f})"
     return CheckResult(
         rule_name="memory_leak",
@@ -115,14 +172,12 @@ def memory_leak(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
     )
 
 
-def excessive_emmc_writes(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
+def excessive_emmc_writes(
+    nmon_file: NmonFile, thresholds: Dict, ctx: Optional[RuleContext] = None
+) -> CheckResult:
+    ctx = ctx or RuleContext.build(nmon_file, thresholds)
     config = thresholds.get("emmc_write", {})
-    regex = re.compile(config.get("device_regex", "^(mmcblk\\d+|mmc\\d+)$"))
-    device_series = [
-        series
-        for name, series in nmon_file.series.items()
-        if name.startswith("disk_write_kbps::") and regex.search(name.split("::", 1)[1])
-    ]
+    device_series = ctx.emmc_devices
     if not device_series:
         return CheckResult(
             rule_name="excessive_emmc_writes",
@@ -136,25 +191,19 @@ def excessive_emmc_writes(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
         values=aggregate,
         timestamps=device_series[0].timestamps,
         thresholds=config,
+        sampling_minutes=ctx.sampling_minutes,
     )
 
 
-def excessive_network_usage(nmon_file: NmonFile, thresholds: Dict) -> CheckResult:
+def excessive_network_usage(
+    nmon_file: NmonFile, thresholds: Dict, ctx: Optional[RuleContext] = None
+) -> CheckResult:
+    ctx = ctx or RuleContext.build(nmon_file, thresholds)
     config = thresholds.get("network", {})
-    regex = re.compile(config.get("iface_include_regex", "^(eth\\d+|enp\\S+|wlan\\d+)$"))
-    include_rx = []
-    include_tx = []
-    for name, series in nmon_file.series.items():
-        if name.startswith("net_rx_kbps::"):
-            iface = name.split("::", 1)[1]
-            if regex.search(iface):
-                include_rx.append(series)
-        elif name.startswith("net_tx_kbps::"):
-            iface = name.split("::", 1)[1]
-            if regex.search(iface):
-                include_tx.append(series)
+    include_rx = ctx.net_rx
+    include_tx = ctx.net_tx
     if not include_rx and not include_tx:
-        total = nmon_file.get_series("net_total_kbps")
+        total = ctx.net_total
         if not total:
             return CheckResult(
                 rule_name="excessive_network_usage",
@@ -165,34 +214,55 @@ def excessive_network_usage(nmon_file: NmonFile, thresholds: Dict) -> CheckResul
         aggregate_values = total.values
         timestamps = total.timestamps
     else:
-        sum_map = defaultdict(float)
         timestamps = include_rx[0].timestamps if include_rx else include_tx[0].timestamps
-        for series in include_rx + include_tx:
-            for ts, value in zip(series.timestamps, series.values):
-                sum_map[ts] += value
-        aggregate_values = [sum_map[ts] for ts in timestamps]
+        aggregate_values = _sum_on_timestamps(include_rx + include_tx, timestamps)
     return _bandwidth_rule(
         rule_name="excessive_network_usage",
         values=aggregate_values,
         timestamps=timestamps,
         thresholds=config,
+        sampling_minutes=ctx.sampling_minutes,
     )
 
 
-def _combine_series(series_list: List[NmonSeries]) -> List[float]:
+def _combine_series(series_list: List[NmonSeries]) -> np.ndarray:
     if not series_list:
-        return []
-    timestamps = series_list[0].timestamps
-    totals = [0.0] * len(timestamps)
+        return np.empty(0, dtype=np.float64)
+    length = len(series_list[0].timestamps)
+    if all(len(series.values) == length for series in series_list):
+        return np.add.reduce([series.values for series in series_list], axis=0)
+    totals = np.zeros(length, dtype=np.float64)
     for series in series_list:
-        for idx, value in enumerate(series.values):
-            if idx < len(totals):
-                totals[idx] += value if value is not None else 0.0
+        values = series.values[:length]
+        totals[: values.size] += values
     return totals
 
 
-def _bandwidth_rule(rule_name: str, values: List[float], timestamps, thresholds: Dict) -> CheckResult:
-    if not values or not timestamps:
+def _sum_on_timestamps(series_list: List[NmonSeries], timestamps: np.ndarray) -> np.ndarray:
+    """Sum every series' samples that fall on one of ``timestamps``."""
+    strictly_increasing = bool(np.all(timestamps[1:] > timestamps[:-1]))
+    if strictly_increasing and all(
+        series.timestamps is timestamps or np.array_equal(series.timestamps, timestamps)
+        for series in series_list
+    ):
+        # Interfaces normally share the ZZZZ grid, so a stacked sum suffices.
+        return np.sum(np.stack([series.values for series in series_list]), axis=0)
+    grid, positions = np.unique(timestamps, return_inverse=True)
+    sums = np.zeros(grid.size, dtype=np.float64)
+    for series in series_list:
+        idx = np.searchsorted(grid, series.timestamps)
+        in_range = idx < grid.size
+        matched = np.zeros(idx.size, dtype=bool)
+        matched[in_range] = grid[idx[in_range]] == series.timestamps[in_range]
+        np.add.at(sums, idx[matched], series.values[matched])
+    return sums[positions]
+
+
+def _bandwidth_rule(
+    rule_name: str, values, timestamps, thresholds: Dict, sampling_minutes: float
+) -> CheckResult:
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0 or len(timestamps) == 0:
         return CheckResult(
             rule_name=rule_name,
             level="OK",
@@ -200,13 +270,12 @@ def _bandwidth_rule(rule_name: str, values: List[float], timestamps, thresholds:
             details={"missing_series": True},
         )
     sustained_minutes = thresholds.get("sustained_minutes", 5)
-    sampling_minutes = infer_sampling_minutes(timestamps) or 1.0
     window_points = max(1, int(round(sustained_minutes / sampling_minutes)))
-    averages = rolling_mean(values, window_points)
     warn_threshold = thresholds.get("kbps_warn", 0)
     crit_threshold = thresholds.get("kbps_crit", 0)
-    warn_window = _first_window_exceedance(averages, timestamps, warn_threshold, window_points)
-    crit_window = _first_window_exceedance(averages, timestamps, crit_threshold, window_points)
+    _, warn_window, crit_window = _window_scan(
+        values, timestamps, window_points, warn_threshold, crit_threshold
+    )
     percentile_95 = safe_percentile(values, 95) if thresholds.get("use_percentile95", False) else float("nan")
     level = "OK"
     evidence = {}
@@ -228,26 +297,43 @@ def _bandwidth_rule(rule_name: str, values: List[float], timestamps, thresholds:
     )
 
 
-def _first_window_exceedance(averages, timestamps, threshold, window_points):
-    for idx, value in enumerate(averages):
-        if math.isnan(value) or value < threshold:
-            continue
-        start_idx = max(0, idx - window_points + 1)
-        if not timestamps:
-            return (start_idx, idx, None, None, float(value))
-        start_ts = timestamps[start_idx] if start_idx < len(timestamps) else None
-        end_ts = timestamps[idx] if idx < len(timestamps) else None
-        return (start_idx, idx, start_ts, end_ts, float(value))
-    return None
+def _window_scan(values: np.ndarray, timestamps, window_points: int, warn_threshold, crit_threshold):
+    """Rolling means plus the first CRIT window, or the first WARN window if none.
+
+    Works on complete windows only, so no NaN padding array is built; window
+    indices are shifted back onto sample positions when reported.
+    """
+    averages = rolling_window_means(values, window_points)
+    offset = len(values) - averages.size
+    crit_window = _first_window_exceedance(averages, offset, timestamps, crit_threshold, window_points)
+    warn_window = None
+    if not crit_window:
+        warn_window = _first_window_exceedance(averages, offset, timestamps, warn_threshold, window_points)
+    return averages, warn_window, crit_window
+
+
+def _first_window_exceedance(averages: np.ndarray, offset: int, timestamps, threshold, window_points):
+    # NaN compares False, so windows over missing data never match.
+    mask = averages >= threshold
+    if not mask.any():
+        return None
+    value = float(averages[mask.argmax()])
+    idx = int(mask.argmax()) + offset
+    start_idx = max(0, idx - window_points + 1)
+    if len(timestamps) == 0:
+        return (start_idx, idx, None, None, value)
+    start_ts = timestamps[start_idx] if start_idx < len(timestamps) else None
+    end_ts = timestamps[idx] if idx < len(timestamps) else None
+    return (start_idx, idx, start_ts, end_ts, value)
 
 
 def _window_to_evidence(window) -> Dict[str, str]:
     start_idx, end_idx, start_ts, end_ts, value = window
     evidence = {"window_start_index": start_idx, "window_end_index": end_idx, "window_average": value}
-    if start_ts:
-        evidence["window_start"] = start_ts.isoformat()
-    if end_ts:
-        evidence["window_end"] = end_ts.isoformat()
+    if start_ts is not None:
+        evidence["window_start"] = isoformat_timestamp(start_ts)
+    if end_ts is not None:
+        evidence["window_end"] = isoformat_timestamp(end_ts)
     return evidence
 
 
@@ -259,13 +345,18 @@ ALL_RULES = [
 ]
 
 
-def run_all_rules(nmon_file: NmonFile, thresholds: Dict) -> Tuple[List[CheckResult], str]:
+def run_all_rules(
+    nmon_file: NmonFile, thresholds: Dict
+) -> Tuple[List[CheckResult], str, Dict[str, int]]:
+    ctx = RuleContext.build(nmon_file, thresholds)
     results: List[CheckResult] = []
     for rule in ALL_RULES:
-        results.append(rule(nmon_file, thresholds))
+        results.append(rule(nmon_file, thresholds, ctx))
     overall = "OK"
+    counts = {level: 0 for level in _LEVEL_ORDER}
     for result in results:
         level = result.level
+        counts[level] += 1
         if _LEVEL_ORDER[level] > _LEVEL_ORDER[overall]:
             overall = level
-    return results, overall
+    return results, overall, counts
@@ -2,14 +2,35 @@
 
 from __future__ import annotations
 
-import json
+import os
 import shutil
+import sqlite3
 import uuid
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .model import FileAnalysis
-from .utils import ensure_directory
+from .utils import ensure_directory, json_dumps, json_loads
+
+
+@lru_cache(maxsize=512)
+def _read_analysis(path: str, mtime_ns: int) -> Dict:
+    # Keyed on mtime so a rewritten analysis misses the cache; callers share
+    # the returned dict and must treat it as read-only.
+    with open(path, "rb") as handle:
+        return json_loads(handle.read())
+
+
+_INDEX_COLUMNS = ("file_id", "hostname", "start_time", "overall")
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    # Unique temp name: two requests may lazily build the same series file.
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
 
 
 class AnalysisStore:
@@ -21,67 +42,135 @@ class AnalysisStore:
         self.analysis_dir = self.base_path / "analyses"
         ensure_directory(self.upload_dir)
         ensure_directory(self.analysis_dir)
-        self.index_path = self.base_path / "index.json"
-        if not self.index_path.exists():
-            self._write_index([])
+        self.index_path = self.base_path / "index.db"
+        self._init_index()
 
     def generate_file_id(self, stem: str) -> str:
         safe_stem = "".join(ch if ch.isalnum() or ch in {"-", "_"} else "-" for ch in stem)
         unique = uuid.uuid4().hex[:8]
         return f"{safe_stem}-{unique}"
 
-    def save_analysis(self, analysis: FileAnalysis, original_file: Path) -> None:
+    def upload_path(self, file_id: str) -> Path:
+        return self.upload_dir / f"{file_id}.nmon"
+
+    def save_upload(self, file_id: str, content: bytes) -> Path:
+        ensure_directory(self.upload_dir)
+        upload_target = self.upload_path(file_id)
+        upload_target.write_bytes(content)
+        return upload_target
+
+    def save_analysis(self, analysis: FileAnalysis, original_file: Optional[Path] = None) -> Dict:
+        """Persist one analysis and return the JSON payload that was written."""
+        return self.save_analysis_batch([(analysis, original_file)])[0]
+
+    def save_analysis_batch(
+        self, items: Iterable[Tuple[FileAnalysis, Optional[Path]]]
+    ) -> List[Dict]:
+        """Persist several analyses, upserting their index rows in one transaction."""
         ensure_directory(self.upload_dir)
         ensure_directory(self.analysis_dir)
-        upload_target = self.upload_dir / f"{analysis.file_id}.nmon"
-        shutil.copy2(original_file, upload_target)
-        analysis_path = self.analysis_dir / f"{analysis.file_id}.json"
-        with open(analysis_path, "w", encoding="utf-8") as handle:
-            json.dump(analysis.as_dict(), handle, indent=2)
-        entries = self._read_index()
-        entry = {
-            "file_id": analysis.file_id,
-            "hostname": analysis.hostname,
-            "start_time": analysis.start_time.isoformat() if analysis.start_time else None,
-            "overall": analysis.overall,
-        }
-        entries = [item for item in entries if item.get("file_id") != analysis.file_id]
-        entries.append(entry)
-        self._write_index(entries)
+        payloads: List[Dict] = []
+        entries: List[Tuple] = []
+        for analysis, original_file in items:
+            if original_file is not None:
+                shutil.copy2(original_file, self.upload_path(analysis.file_id))
+                # The chart cache was built from the previous upload.
+                self.series_path(analysis.file_id).unlink(missing_ok=True)
+            payload = analysis.as_dict()
+            payloads.append(payload)
+            analysis_path = self.analysis_dir / f"{analysis.file_id}.json"
+            _atomic_write(analysis_path, json_dumps(payload, indent=True))
+            entries.append((
+                analysis.file_id,
+                analysis.hostname,
+                analysis.start_time.isoformat() if analysis.start_time else None,
+                analysis.overall,
+            ))
+        self._upsert_index(entries)
+        return payloads
+
+    def series_path(self, file_id: str) -> Path:
+        return self.upload_dir / f"{file_id}.series.json"
+
+    def save_series(self, file_id: str, payload: Dict) -> None:
+        self.save_series_bytes(file_id, json_dumps(payload))
+
+    def save_series_bytes(self, file_id: str, data: bytes) -> None:
+        ensure_directory(self.upload_dir)
+        _atomic_write(self.series_path(file_id), data)
+
+    def load_series_bytes(self, file_id: str) -> Optional[bytes]:
+        series_path = self.series_path(file_id)
+        if not series_path.exists():
+            return None
+        return series_path.read_bytes()
 
     def load_analysis(self, file_id: str) -> Optional[Dict]:
         analysis_path = self.analysis_dir / f"{file_id}.json"
-        if not analysis_path.exists():
+        try:
+            mtime_ns = analysis_path.stat().st_mtime_ns
+        except FileNotFoundError:
             return None
-        with open(analysis_path, "r", encoding="utf-8") as handle:
-            return json.load(handle)
+        return _read_analysis(str(analysis_path), mtime_ns)
 
     def list_analyses(self) -> List[Dict]:
-        entries = self._read_index()
-        entries.sort(key=lambda item: item.get("start_time") or "", reverse=True)
-        return entries
-
-    def _read_index(self) -> List[Dict]:
-        if not self.index_path.exists():
-            return []
-        with open(self.index_path, "r", encoding="utf-8") as handle:
-            try:
-                return json.load(handle)
-            except json.JSONDecodeError:
-                return []
+        with self._index_db() as conn:
+            rows = conn.execute(
+                "SELECT file_id, hostname, start_time, overall FROM analyses"
+                " ORDER BY start_time DESC"
+            ).fetchall()
+        return [dict(zip(_INDEX_COLUMNS, row)) for row in rows]
+
+    @contextmanager
+    def _index_db(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per call keeps the store safe to share
+        # between Flask threads and CLI worker processes.
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
 
-    def _write_index(self, entries: List[Dict]) -> None:
+    def _init_index(self) -> None:
         ensure_directory(self.base_path)
-        with open(self.index_path, "w", encoding="utf-8") as handle:
-            json.dump(entries, handle, indent=2)
+        with self._index_db() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "file_id TEXT PRIMARY KEY, hostname TEXT, start_time TEXT, overall TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analyses_start ON analyses(start_time DESC)"
+            )
+        self._migrate_legacy_index()
+
+    def _upsert_index(self, rows: List[Tuple]) -> None:
+        with self._index_db() as conn:
+            conn.executemany("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)", rows)
+
+    def _migrate_legacy_index(self) -> None:
+        """Import an index.json / index.jsonl left by older versions, then drop it."""
+        for legacy_path in (self.base_path / "index.json", self.base_path / "index.jsonl"):
+            if not legacy_path.exists():
+                continue
+            data = legacy_path.read_bytes()
+            try:
+                entries = json_loads(data) if legacy_path.suffix == ".json" else [
+                    json_loads(line) for line in data.splitlines() if line.strip()
+                ]
+            except ValueError:
+                entries = []
+            self._upsert_index(
+                [tuple(entry.get(column) for column in _INDEX_COLUMNS) for entry in entries]
+            )
+            legacy_path.unlink()
 
     def clear(self) -> None:
-        if self.index_path.exists():
-            self.index_path.unlink()
+        with self._index_db() as conn:
+            conn.execute("DELETE FROM analyses")
         if self.upload_dir.exists():
             shutil.rmtree(self.upload_dir)
         if self.analysis_dir.exists():
             shutil.rmtree(self.analysis_dir)
         ensure_directory(self.upload_dir)
         ensure_directory(self.analysis_dir)
-        self._write_index([])
@@ -2,77 +2,142 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict
+from dataclasses import fields, is_dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from statistics import median
-from typing import List, Sequence
+from typing import Sequence
 
+import json
 import math
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 
 def ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def infer_sampling_minutes(timestamps: Sequence[datetime]) -> float:
-    if len(timestamps) < 2:
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode("utf-8")
+
+
+def json_loads(data: bytes | str):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Files written by the stdlib encoder may contain NaN literals.
+            pass
+    return json.loads(data)
+
+
+def isoformat_timestamp(timestamp) -> str:
+    return str(np.datetime_as_string(np.datetime64(timestamp, "s"), unit="s"))
+
+
+def infer_sampling_minutes(timestamps: np.ndarray | Sequence[datetime]) -> float:
+    ts = np.asarray(timestamps, dtype="datetime64[s]")
+    if ts.size < 2:
         return 0.0
-    deltas = [
-        (b - a).total_seconds() / 60.0
-        for a, b in zip(timestamps[:-1], timestamps[1:])
-        if b > a
-    ]
-    if not deltas:
+    deltas = np.diff(ts).astype(np.int64) / 60.0
+    deltas = deltas[deltas > 0]
+    if not deltas.size:
         return 0.0
-    return float(median(deltas))
+    return float(np.median(deltas))
+
 
+def rolling_window_means(values: Sequence[float], window: int) -> np.ndarray:
+    """Mean of every complete window, i.e. ``len(values) - window + 1`` entries.
 
-def rolling_mean(values: Sequence[float], window: int) -> List[float]:
+    NaN samples are skipped: each window is averaged over its valid samples
+    only, and a window with none of them is NaN.
+    """
+    arr = np.asarray(values, dtype=np.float64)
     if window <= 1:
-        return list(values)
-    if len(values) < window:
-        return [float("nan")] * len(values)
-    cumsum = [0.0]
-    total = 0.0
-    for value in values:
-        total += value if value is not None else 0.0
-        cumsum.append(total)
-    result = []
-    for idx in range(window, len(cumsum)):
-        window_sum = cumsum[idx] - cumsum[idx - window]
-        result.append(window_sum / window)
-    pad = [float("nan")] * (window - 1)
-    return pad + result
+        return arr.copy()
+    if arr.size < window:
+        return np.empty(0, dtype=np.float64)
+    missing = np.isnan(arr)
+    sums = _window_sums(np.nan_to_num(arr, nan=0.0), window)
+    if not missing.any():
+        return sums / window
+    counts = window - _window_sums(missing.astype(np.float64), window)
+    means = np.full(sums.size, np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return means
+
+
+_RESUM_BLOCK = 4096
+
+
+def _window_sums(arr: np.ndarray, window: int) -> np.ndarray:
+    # Differencing one long cumsum loses precision in proportion to the
+    # running total, which for multi-day captures of large KB counters can
+    # move a window across a threshold. Restarting the cumsum every
+    # _RESUM_BLOCK windows bounds the error by the block length instead.
+    count = arr.size - window + 1
+    sums = np.empty(count, dtype=np.float64)
+    cumsum = np.empty(min(count, _RESUM_BLOCK) + window, dtype=np.float64)
+    cumsum[0] = 0.0
+    for start in range(0, count, _RESUM_BLOCK):
+        stop = min(start + _RESUM_BLOCK, count)
+        chunk = arr[start : stop + window - 1]
+        np.cumsum(chunk, out=cumsum[1 : chunk.size + 1])
+        sums[start:stop] = cumsum[window : chunk.size + 1] - cumsum[: stop - start]
+    return sums
+
+
+def rolling_mean(values: Sequence[float], window: int) -> np.ndarray:
+    means = rolling_window_means(values, window)
+    missing = len(values) - means.size
+    if not missing:
+        return means
+    return np.concatenate([np.full(missing, np.nan), means])
 
 
 def safe_percentile(values: Sequence[float], percentile: float) -> float:
-    if not values:
-        return float("nan")
-    data = sorted(values)
-    if not data:
+    arr = np.asarray(values, dtype=np.float64)
+    arr = arr[~np.isnan(arr)]
+    if not arr.size:
         return float("nan")
-    k = (len(data) - 1) * (percentile / 100.0)
-    f = math.floor(k)
-    c = math.ceil(k)
-    if f == c:
-        return float(data[int(k)])
-    d0 = data[f] * (c - k)
-    d1 = data[c] * (k - f)
-    return float(d0 + d1)
+    return float(np.percentile(arr, percentile))
 
 
-def linear_regression(series: Sequence[float], timestamps: Sequence[datetime]):
+def linear_regression(series: Sequence[float], timestamps: np.ndarray | Sequence[datetime]):
     if len(series) < 2 or len(series) != len(timestamps):
         return None
-    x = [(ts - timestamps[0]).total_seconds() / 60.0 for ts in timestamps]
-    y = list(series)
-    n = len(x)
-    mean_x = sum(x) / n
-    mean_y = sum(y) / n
-    ss_xy = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
-    ss_xx = sum((xi - mean_x) ** 2 for xi in x)
-    ss_yy = sum((yi - mean_y) ** 2 for yi in y)
+    ts = np.asarray(timestamps, dtype="datetime64[s]")
+    x = (ts - ts[0]).astype(np.int64) / 60.0
+    y = np.asarray(series, dtype=np.float64)
+    mean_x = x.mean()
+    mean_y = y.mean()
+    # Centre before the dot products: x @ x - n * mean_x**2 cancels badly
+    # for large KB counters.
+    dx = x - mean_x
+    dy = y - mean_y
+    ss_xy = float(dx @ dy)
+    ss_xx = float(dx @ dx)
+    ss_yy = float(dy @ dy)
     slope = ss_xy / ss_xx if ss_xx else 0.0
     intercept = mean_y - slope * mean_x
     rvalue = ss_xy / math.sqrt(ss_xx * ss_yy) if ss_xx and ss_yy else 0.0
@@ -86,19 +151,21 @@ def linear_regression(series: Sequence[float], timestamps: Sequence[datetime]):
 
 
 def downsample_series(
-    timestamps: Sequence[datetime],
+    timestamps: np.ndarray | Sequence[datetime],
     values: Sequence[float],
     max_points: int = 3000,
 ) -> dict:
-    if len(timestamps) <= max_points:
-        return {
-            "timestamps": [ts.isoformat() for ts in timestamps],
-            "values": list(values),
-        }
-    step = max(1, len(timestamps) // max_points)
+    ts = np.asarray(timestamps, dtype="datetime64[s]")
+    vals = np.asarray(values, dtype=np.float64)
+    if len(ts) > max_points:
+        # Evenly spaced picks that always keep the first and last sample,
+        # and never exceed max_points (a fixed stride could overshoot it).
+        idx = np.linspace(0, len(ts) - 1, max_points).astype(np.int64)
+        ts = ts[idx]
+        vals = vals[idx]
     return {
-        "timestamps": [ts.isoformat() for ts in timestamps[::step]],
-        "values": list(values[::step]),
+        "timestamps": np.datetime_as_string(ts, unit="s").tolist(),
+        "values": vals.tolist(),
     }
 
 
@@ -107,4 +174,20 @@ def now_local() -> datetime:
 
 
 def dataclass_to_dict(obj) -> dict:
-    return asdict(obj)
+    """Shallow ``asdict``: arrays and other leaf values are returned as-is, not copied."""
+    return {field.name: _field_value(getattr(obj, field.name)) for field in fields(obj)}
+
+
+def _field_value(value):
+    # Containers are rebuilt so nested dataclasses convert; leaves such as
+    # ndarrays are shared rather than deep-copied as asdict would.
+    if is_dataclass(value) and not isinstance(value, type):
+        return dataclass_to_dict(value)
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        # namedtuples take their fields positionally.
+        return type(value)(*(_field_value(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return type(value)(_field_value(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _field_value(item) for key, item in value.items()}
+    return value
@@ -1,7 +1,9 @@
 import unittest
+from datetime import datetime
+from io import BytesIO
 from pathlib import Path
 
-from core.parser import parse_nmon
+from core.parser import NmonParser, _feed_lines, parse_nmon
 from core.utils import infer_sampling_minutes
 
 
@@ -27,13 +29,13 @@ class ParserTestCase(unittest.TestCase):
         nmon = parse_nmon(self.sample_path)
         disk = nmon.get_series("disk_write_kbps::mmcblk0")
         self.assertIsNotNone(disk)
-        self.assertEqual(disk.values, [150.0, 200.0])
+        self.assertEqual(disk.values.tolist(), [150.0, 200.0])
 
     def test_network_total(self):
         nmon = parse_nmon(self.sample_path)
         net = nmon.get_series("net_total_kbps")
         self.assertIsNotNone(net)
-        self.assertEqual(net.values, [180.0, 210.0])
+        self.assertEqual(net.values.tolist(), [180.0, 210.0])
 
     def test_sampling_interval(self):
         nmon = parse_nmon(self.sample_path)
@@ -41,6 +43,71 @@ class ParserTestCase(unittest.TestCase):
         interval = infer_sampling_minutes(cpu.timestamps)
         self.assertAlmostEqual(interval, 1.0)
 
+    def test_parse_from_stream(self):
+        nmon = parse_nmon(BytesIO(self.sample_path.read_bytes()))
+        self.assertEqual(nmon.hostname, "myhost")
+        cpu = nmon.get_series("cpu_busy_pct")
+        self.assertAlmostEqual(cpu.values[1], 25.0)
+
+    def test_comma_space_separated(self):
+        content = self.sample_path.read_bytes().replace(b",", b", ")
+        spaced = parse_nmon(BytesIO(content))
+        plain = parse_nmon(self.sample_path)
+        self.assertEqual(sorted(spaced.series), sorted(plain.series))
+        self.assertEqual(
+            spaced.get_series("cpu_busy_pct").values.tolist(),
+            plain.get_series("cpu_busy_pct").values.tolist(),
+        )
+
+    def test_indented_lines_parsed(self):
+        content = b"\n".join([
+            b"ZZZZ,T0001,00:00:00,01-JUN-2024",
+            b"ZZZZ,T0002,00:01:00,01-JUN-2024",
+            b"CPU_ALL,CPU Total,User%,Sys%,Wait%,Idle%",
+            b"  CPU_ALL,T0001,10,5,0,85",
+            b"CPU_ALL,T0002,10,10,0,80",
+        ])
+        cpu = parse_nmon(BytesIO(content)).get_series("cpu_busy_pct")
+        self.assertEqual(cpu.values.tolist(), [15.0, 20.0])
+
+    def test_out_of_order_rows_sorted(self):
+        content = b"\n".join([
+            b"ZZZZ,T0001,00:00:00,01-JUN-2024",
+            b"ZZZZ,T0002,00:01:00,01-JUN-2024",
+            b"DISKWRITE,Disk Write KB/s,mmcblk0",
+            b"DISKWRITE,T0002,mmcblk0,200",
+            b"DISKWRITE,T0001,mmcblk0,100",
+            b"NET,Network I/O,eth0-read-KB/s,eth0-write-KB/s",
+            b"NET,T0002,eth0,20,2",
+            b"NET,T0001,eth0,10,1",
+        ])
+        nmon = parse_nmon(BytesIO(content))
+        disk = nmon.get_series("disk_write_kbps::mmcblk0")
+        self.assertEqual(disk.values.tolist(), [100.0, 200.0])
+        self.assertTrue((disk.timestamps[1:] > disk.timestamps[:-1]).all())
+        self.assertEqual(nmon.get_series("net_rx_kbps::eth0").values.tolist(), [10.0, 20.0])
+        self.assertEqual(nmon.get_series("net_total_kbps").values.tolist(), [11.0, 22.0])
+
+    def test_quotes_are_not_special(self):
+        content = b'AAA,note0,"unbalanced\n' + self.sample_path.read_bytes()
+        nmon = parse_nmon(BytesIO(content))
+        self.assertEqual(nmon.hostname, "myhost")
+        self.assertIsNotNone(nmon.get_series("cpu_busy_pct"))
+        parser = NmonParser()
+        _feed_lines(parser, [b'DISKWRITE,"Disk, Write",mmcblk0\n'])
+        self.assertEqual(parser.headers["DISKWRITE"], ['"Disk', 'Write"', "mmcblk0"])
+
+    def test_timestamp_formats(self):
+        parser = NmonParser()
+        parser.feed_line("ZZZZ,T0001,00:00:00,2024-06-01")
+        parser.feed_line("ZZZZ,T0002,00:01:00,01-Jun-2024")
+        parser.feed_line("ZZZZ,T0003,00:02:00,06/01/2024")
+        parser.feed_line("ZZZZ,T0004,00:03:00,01-JUN-2024")
+        self.assertEqual(parser.timestamp_labels["T0001"], datetime(2024, 6, 1, 0, 0, 0))
+        self.assertEqual(parser.timestamp_labels["T0002"], datetime(2024, 6, 1, 0, 1, 0))
+        self.assertEqual(parser.timestamp_labels["T0003"], datetime(2024, 6, 1, 0, 2, 0))
+        self.assertEqual(parser.timestamp_labels["T0004"], datetime(2024, 6, 1, 0, 3, 0))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from core.model import CheckResult, FileAnalysis
+from core.store import AnalysisStore
+
+
+def _analysis(file_id, start_time, overall="OK"):
+    return FileAnalysis(
+        file_id=file_id,
+        source_path=f"{file_id}.nmon",
+        hostname="host",
+        start_time=start_time,
+        checks=[],
+        overall=overall,
+    )
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_list_is_newest_first_and_upserts(self):
+        store = AnalysisStore(self.base)
+        store.save_analysis(_analysis("a", datetime(2024, 1, 1)))
+        store.save_analysis(_analysis("b", datetime(2024, 2, 1)))
+        store.save_analysis(_analysis("a", datetime(2024, 1, 1), overall="CRIT"))
+        entries = AnalysisStore(self.base).list_analyses()
+        self.assertEqual([entry["file_id"] for entry in entries], ["b", "a"])
+        self.assertEqual(entries[1]["overall"], "CRIT")
+
+    def test_reingest_drops_stale_series_cache(self):
+        store = AnalysisStore(self.base)
+        source = self.base / "host.nmon"
+        source.write_bytes(b"AAA,host,myhost\n")
+        store.save_series("host", {"cpu_busy_pct": {"timestamps": [], "values": []}})
+        store.save_analysis(_analysis("host", None), original_file=source)
+        self.assertIsNone(store.load_series_bytes("host"))
+
+    def test_saved_counts_follow_checks(self):
+        analysis = _analysis("a", None, overall="WARN")
+        analysis.checks.append(CheckResult("rule", "WARN", "slow"))
+        data = AnalysisStore(self.base).save_analysis(analysis)
+        self.assertEqual((data["warn_count"], data["crit_count"]), (1, 0))
+
+    def test_legacy_index_is_migrated(self):
+        (self.base / "index.json").write_text(
+            '[{"file_id": "old", "hostname": "h", "start_time": null, "overall": "WARN"}]'
+        )
+        store = AnalysisStore(self.base)
+        self.assertFalse((self.base / "index.json").exists())
+        self.assertEqual(store.list_analyses()[0]["file_id"], "old")
+
+
+if __name__ == "__main__":
+    unittest.main()
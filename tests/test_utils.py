@@ -0,0 +1,70 @@
+import math
+import unittest
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from core.utils import dataclass_to_dict, downsample_series, rolling_mean, safe_percentile
+
+Point = namedtuple("Point", ["x", "y"])
+
+
+@dataclass
+class _Leaf:
+    values: np.ndarray
+    point: Point
+
+
+@dataclass
+class _Tree:
+    name: str
+    leaves: List[_Leaf] = field(default_factory=list)
+
+
+class UtilsTestCase(unittest.TestCase):
+    def test_rolling_mean_window(self):
+        result = rolling_mean([1.0, 2.0, 3.0, 4.0], 2)
+        self.assertTrue(math.isnan(result[0]))
+        self.assertEqual(result[1:].tolist(), [1.5, 2.5, 3.5])
+
+    def test_rolling_mean_gap_does_not_poison_tail(self):
+        result = rolling_mean([1.0, float("nan"), 3.0, 3.0, 3.0], 2)
+        self.assertEqual(result[-1], 3.0)
+
+    def test_rolling_mean_averages_valid_samples_only(self):
+        result = rolling_mean([2.0, float("nan"), 4.0, float("nan"), float("nan")], 2)
+        self.assertEqual(result[1:4].tolist(), [2.0, 4.0, 4.0])
+        self.assertTrue(math.isnan(result[4]))
+
+    def test_rolling_mean_stays_precise_on_long_large_series(self):
+        values = 3e9 + np.tile([0.1, 1000.3, -250.7, 125.9], 50_000)
+        result = rolling_mean(values, 4)
+        self.assertAlmostEqual(result[-1], 3e9 + 218.9, delta=1e-3)
+
+    def test_safe_percentile_ignores_nan(self):
+        self.assertAlmostEqual(safe_percentile([1.0, float("nan"), 2.0, 3.0, 4.0], 50), 2.5)
+        self.assertTrue(math.isnan(safe_percentile([], 95)))
+
+    def test_downsample_keeps_endpoints_and_limit(self):
+        timestamps = np.arange(0, 7000, dtype="datetime64[s]")
+        result = downsample_series(timestamps, np.arange(7000.0), max_points=3000)
+        self.assertEqual(len(result["values"]), 3000)
+        self.assertEqual(result["values"][0], 0.0)
+        self.assertEqual(result["values"][-1], 6999.0)
+        self.assertEqual(result["timestamps"][-1], "1970-01-01T01:56:39")
+
+    def test_dataclass_to_dict_is_shallow(self):
+        values = np.arange(3.0)
+        tree = _Tree("root", [_Leaf(values, Point(1, 2))])
+        result = dataclass_to_dict(tree)
+        leaf = result["leaves"][0]
+        self.assertIsInstance(leaf, dict)
+        self.assertIs(leaf["values"], values)
+        self.assertEqual(leaf["point"], Point(1, 2))
+        self.assertIsInstance(leaf["point"], Point)
+
+
+if __name__ == "__main__":
+    unittest.main()